@@ -0,0 +1,85 @@
+"""
+Numba-compiled versions of the artifact detection and filtering loops.
+
+Numba is an optional dependency: importing this module raises an ImportError
+when it is not installed, and find_artifacts.py and utils.py then fall back
+to NumPy/SciPy.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True, fastmath=True)
+def _find_ext_artifact(data, thresh, start):
+    """
+    Returns the index of the first sample (from start) that is below thresh
+    and lower than its previous and next samples, or -1 if there is none.
+    """
+    for q in range(start, data.shape[0] - 2):
+        if data[q] <= thresh and data[q] < data[q + 1] and data[q] < data[q - 1]:
+            return q
+    return -1
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _sliding_dot(data, ker):
+    """
+    Returns the dot-products between ker and every snippet
+    data[i : i + len(ker)], for i in [0, len(data) - len(ker)).
+    """
+    n = data.shape[0] - ker.shape[0]
+    out = np.empty(n, dtype=data.dtype)
+    for i in prange(n):
+        s = 0.0
+        for j in range(ker.shape[0]):
+            s += ker[j] * data[i + j]
+        out[i] = s
+    return out
+
+
+@njit(cache=True)
+def _sosfilt_inplace(sos, x, zi):
+    """
+    Filters x in place with the second-order sections sos, in direct form II
+    transposed, starting from the states zi (modified).
+    """
+    for i in range(x.shape[0]):
+        value = x[i]
+        for s in range(sos.shape[0]):
+            out = sos[s, 0] * value + zi[s, 0]
+            zi[s, 0] = sos[s, 1] * value - sos[s, 4] * out + zi[s, 1]
+            zi[s, 1] = sos[s, 2] * value - sos[s, 5] * out
+            value = out
+        x[i] = value
+
+
+@njit(cache=True)
+def _sosfiltfilt(sos, x, zi, padlen):
+    """
+    Same as scipy.signal.sosfiltfilt(sos, x, padtype="odd", padlen=padlen),
+    with zi = scipy.signal.sosfilt_zi(sos) (x must be longer than padlen,
+    and padlen > 0).
+    The odd extensions at both ends are filtered on their own, so that only
+    the output array is allocated at the size of x.
+    """
+    n = x.shape[0]
+    left = np.empty(padlen)
+    right = np.empty(padlen)
+    for i in range(padlen):
+        left[i] = 2.0 * x[0] - x[padlen - i]
+        right[i] = 2.0 * x[n - 1] - x[n - 2 - i]
+    out = x.copy()
+
+    # forward pass, starting in steady state for the first sample
+    state = zi * left[0]
+    _sosfilt_inplace(sos, left, state)
+    _sosfilt_inplace(sos, out, state)
+    _sosfilt_inplace(sos, right, state)
+    # backward pass (on reversed views), starting in steady state for the
+    # last filtered sample (the left extension is not needed anymore)
+    state = zi * right[-1]
+    _sosfilt_inplace(sos, right[::-1], state)
+    _sosfilt_inplace(sos, out[::-1], state)
+
+    return out
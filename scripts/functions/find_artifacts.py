@@ -1,6 +1,14 @@
 import numpy as np
 from scipy.signal import find_peaks
-from itertools import compress
+from numpy.lib.stride_tricks import sliding_window_view
+
+# numba is optional, the NumPy/SciPy implementations are used without it
+try:
+    from functions._numba_kernels import _find_ext_artifact, _sliding_dot
+
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
 
 
 # Detection of artifacts in TMSi
@@ -40,9 +48,10 @@ def find_external_sync_artifact(data: np.ndarray, sf_external: int, start_index=
     artifacts.
     """
     # check polarity of artifacts before detection:
-    if abs(max(data[:-1000])) > abs(min(data[:-1000])):
+    polarity_window = data[:-1000]
+    if abs(polarity_window.max()) > abs(polarity_window.min()):
         print("external signal is reversed")
-        data = data * -1
+        data = -data
         print("invertion undone")
 
     # define thresh_BIP as 1.5 times the difference between the max and min
@@ -53,19 +62,31 @@ def find_external_sync_artifact(data: np.ndarray, sf_external: int, start_index=
     # frequency (stimulation frequency). Therefore, the artifact is detected when
     # the signal is below the threshold, and when the signal is lower than the
     # previous and next sample (first peak of the artifact).
-
-    for q in range(start_index, len(data) - 2):
-        if (
-            (data[q] <= thresh_BIP)
-            and (data[q] < data[q + 1])
-            and (data[q] < data[q - 1])
-        ):
-            art_time_BIP = q / sf_external
-            break
+    if HAVE_NUMBA:
+        q = _find_ext_artifact(data, thresh_BIP, start_index)
+    else:
+        # only the (few) samples below the threshold are checked for being
+        # a local minimum
+        below = (
+            np.flatnonzero(data[start_index : len(data) - 2] <= thresh_BIP) + start_index
+        )
+        is_local_min = (data[below] < data[below + 1]) & (data[below] < data[below - 1])
+        q = below[is_local_min][0] if is_local_min.any() else -1
+    assert q >= 0, "No artifact found in the external recording"
+    art_time_BIP = q / sf_external
 
     return art_time_BIP
 
 
+def _width_above(signal: np.ndarray, threshold: float):
+    """
+    Returns the number of consecutive samples, from the start of signal,
+    that are above threshold (the whole length if it never falls under it).
+    """
+    under = signal <= threshold
+    return int(np.argmax(under)) if under.any() else len(under)
+
+
 # Detection of artifacts in LFP
 def find_LFP_sync_artifact(data: np.ndarray, sf_LFP: int, use_method: str):
     """
@@ -103,6 +124,10 @@ def find_LFP_sync_artifact(data: np.ndarray, sf_LFP: int, use_method: str):
     # checks correct input for use_kernel variable
     assert use_method in ["1", "2", "thresh"], "use_method incorrect. Should be '1', '2' or 'thresh'"
 
+    # single precision is enough for LFP amplitudes (µV) and halves the
+    # memory traffic of the vectorized operations below
+    data = np.ascontiguousarray(data, dtype=np.float32)
+
     if use_method == "thresh":
         thres_window = sf_LFP * 2
         thres = np.ptp(data[:thres_window])
@@ -112,9 +137,10 @@ def find_LFP_sync_artifact(data: np.ndarray, sf_LFP: int, use_method: str):
         over_thres = np.where(abs_data > thres)[0][0]
         # Take last sample that lies within the value distribution of the thres_window before the threshold passing
         # The percentile is something that can be varied
-        stim_idx = np.where(
-            abs_data[:over_thres] <= np.percentile(abs_data[:over_thres], 95)
-        )[0][-1]
+        before_thres = abs_data[:over_thres]
+        p95 = np.percentile(before_thres, 95)
+        # (first match when reading backwards = last match)
+        stim_idx = over_thres - 1 - int(np.argmax(before_thres[::-1] <= p95))
 
 
 
@@ -125,29 +151,34 @@ def find_LFP_sync_artifact(data: np.ndarray, sf_LFP: int, use_method: str):
             "1": np.array([1, -1]),
             "2": np.array([1, 0, -1] + list(np.linspace(-1, 0, 20))),
         }
-        ker = kernels[use_method]
+        ker = kernels[use_method].astype(np.float32)
 
-        
         # get dot-products between kernel and time-serie snippets
-        res = []  # store results of dot-products
-        for i in np.arange(0, len(data) - len(ker)):
-            res.append(ker @ data[i : i + len(ker)])
-            # calculate dot-product of vectors
-            # the dot-product result is high when the timeseries snippet
-            # is very similar to the kernel
-        res = np.array(res)  # convert list to array
+        # the dot-product result is high when the timeseries snippet
+        # is very similar to the kernel.
+        # sliding dot-products = correlation of the data with the kernel,
+        # last snippet excluded as before
+        n_snippets = len(data) - len(ker)
+        if HAVE_NUMBA and use_method == "2":
+            res = _sliding_dot(data, ker)
+        else:
+            res = np.correlate(data, ker, mode="valid")[:n_snippets]
 
         # normalise dot product results
-        res = res / max(res)
+        res = res / res.max()
+        res_max = res.max()
+        res_min = res.min()
+        # (accumulate in double precision, the baseline std can be small)
+        res_std5 = res[: sf_LFP * 5].std(dtype=np.float64)
 
         # calculate a ratio between std dev and maximum during
         # the first seconds to check whether an stim-artifact was present
-        ratio_max_sd = np.max(res[: sf_LFP * 30] / np.std(res[: sf_LFP * 5]))
+        ratio_max_sd = res[: sf_LFP * 30].max() / res_std5
 
         # find peak of kernel dot products
         # pos_idx contains all the positive peaks, neg_idx all the negative peaks
-        pos_idx = find_peaks(x=res, height=0.3 * max(res), distance=sf_LFP)[0]
-        neg_idx = find_peaks(x=-res, height=-0.3 * min(res), distance=sf_LFP)[0]
+        pos_idx = find_peaks(x=res, height=0.3 * res_max, distance=sf_LFP)[0]
+        neg_idx = find_peaks(x=-res, height=-0.3 * res_min, distance=sf_LFP)[0]
 
         # check warn if NO STIM artifacts are suspected
         if (len(neg_idx) > 20 and ratio_max_sd < 8) or (len(pos_idx) > 20 and ratio_max_sd < 8):
@@ -169,42 +200,39 @@ def find_LFP_sync_artifact(data: np.ndarray, sf_LFP: int, use_method: str):
             if (
                 pos_idx[0] - neg_idx[0]
             ) < 50:  # if first positive and negative are very close
-                width_pos = 0
-                r_i = pos_idx[0]
-                while res[r_i] > (max(res) * 0.3):
-                    r_i += 1
-                    width_pos += 1
-                width_neg = 0
-                r_i = neg_idx[0]
-                while res[r_i] < (min(res) * 0.3):
-                    r_i += 1
-                    width_neg += 1
+                # width = number of samples until the dot-product falls back
+                # under 30% of its extremum (searched within one second),
+                # negative peaks are measured on the sign-flipped dot-products
+                width_pos = _width_above(
+                    res[pos_idx[0] : pos_idx[0] + sf_LFP], 0.3 * res_max
+                )
+                width_neg = _width_above(
+                    -res[neg_idx[0] : neg_idx[0] + sf_LFP], -0.3 * res_min
+                )
                 # undo invertion if negative dot-product (pos lfp peak) is very narrow
                 if width_pos > (2 * width_neg):
                     signal_inverted = False
                     print("invertion undone")
 
         # return either POS or NEG peak-indices based on normal or inverted signal
+        # ('normal' signal: the artifact is a negative deflection of the data)
         if not signal_inverted:
-            stim_idx = pos_idx  # this is for 'normal' signal
-
+            stim_idx = pos_idx
+            polarity = 1
         elif signal_inverted:
             stim_idx = neg_idx
+            polarity = -1
 
         # filter out inconsistencies in peak heights (assuming sync-stim-artifacts are stable)
-        abs_heights = [max(abs(data[i - 5 : i + 5])) for i in stim_idx]
+        # (one 10-sample window around each peak, from data[i - 5] to data[i + 4],
+        # shifted inwards for peaks closer than 5 samples to the edges)
+        window_starts = np.clip(stim_idx - 5, 0, len(data) - 10)
+        peak_windows = polarity * sliding_window_view(data, 10)[window_starts]
+        abs_heights = np.abs(peak_windows).max(axis=1)
 
         # check polarity of peak
-        if not signal_inverted:
-            sel_idx = np.array([min(data[i - 5 : i + 5]) for i in stim_idx]) < (
-                np.median(abs_heights) * -0.5
-            )
-        elif signal_inverted:
-            sel_idx = np.array([max(data[i - 5 : i + 5]) for i in stim_idx]) > (
-                np.median(abs_heights) * 0.5
-            )
-        stim_idx_all = list(compress(stim_idx, sel_idx))
-        stim_idx = stim_idx_all[0]
+        sel_idx = peak_windows.min(axis=1) < (np.median(abs_heights) * -0.5)
+        stim_idx = int(stim_idx[sel_idx][0])
 
     art_time_LFP = stim_idx / sf_LFP
 
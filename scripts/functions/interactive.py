@@ -1,7 +1,8 @@
 import matplotlib.pyplot as plt
+from matplotlib.widgets import Cursor
 import numpy as np
 
-from functions.utils import _get_input_y_n
+from functions.utils import _get_input_y_n, _plot_envelope
 
 
 def select_sample(signal: np.ndarray, sf: int, color1: str, color2: str):
@@ -21,7 +22,7 @@ def select_sample(signal: np.ndarray, sf: int, color1: str, color2: str):
     closest_value: float, the manually selected sample
     """
 
-    signal_timescale_s = np.arange(0, (len(signal) / sf), (1 / sf))
+    signal_timescale_s = np.arange(len(signal), dtype=np.float64) / sf
     selected_x = interaction(
         data=signal, timescale=signal_timescale_s, color1=color1, color2=color2
     )
@@ -56,6 +57,10 @@ def interaction(data: np.ndarray, timescale: np.ndarray, color1: str, color2: st
 
     (plus_symbol,) = ax.plot([], [], "k+", markersize=10)
 
+    # crosshair following the mouse, only the cursor lines are redrawn
+    # (blitted) on each move, not the plotted signal
+    cursor = Cursor(ax, useblit=True, color="k", linewidth=1)
+
     def onclick(event):
         if event.xdata is not None and event.ydata is not None:
             pos.append([event.xdata, event.ydata])
@@ -64,7 +69,7 @@ def interaction(data: np.ndarray, timescale: np.ndarray, color1: str, color2: st
             closest_index_x = np.argmin(np.abs(timescale - event.xdata))
             closest_value_x = timescale[closest_index_x]
             closest_value_y = data[closest_index_x]
-            plus_symbol.set_data(closest_value_x, closest_value_y)
+            plus_symbol.set_data([closest_value_x], [closest_value_y])
             plt.draw()
 
     fig.canvas.mpl_connect("button_press_event", onclick)
@@ -87,3 +92,110 @@ def interaction(data: np.ndarray, timescale: np.ndarray, color1: str, color2: st
     artifact_x = [x_list[0] for x_list in pos]  # list of all clicked x values
 
     return artifact_x[-1]
+
+
+def select_two_samples(
+    signal1: np.ndarray,
+    sf1: int,
+    signal2: np.ndarray,
+    sf2: int,
+    colors1: tuple,
+    colors2: tuple,
+):
+    """
+    This function allows the user to select one sample in each of two signals,
+    plotted one above the other in the same figure (with a shared time axis).
+    The user can zoom in and out, and the last click in each plot before
+    answering y will be the selected samples.
+
+    Inputs:
+    signal1: np.ndarray, the signal to plot on top
+    sf1: int, the sampling frequency of signal1
+    signal2: np.ndarray, the signal to plot below
+    sf2: int, the sampling frequency of signal2
+    colors1: tuple, the colors to plot signal1 as a line and scattered
+    colors2: tuple, the colors to plot signal2 as a line and scattered
+
+    Returns:
+    closest_value1: float, the manually selected sample in signal1
+    closest_value2: float, the manually selected sample in signal2
+    """
+
+    timescale1 = np.arange(len(signal1), dtype=np.float64) / sf1
+    timescale2 = np.arange(len(signal2), dtype=np.float64) / sf2
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, sharex=True)
+    fig.suptitle(
+        "Click on each plot to select the sample where the artifact starts. \n"
+        'You can use the zoom, as long as the black "+" are placed on the \n'
+        'correct samples before answering "y" in the terminal'
+    )
+
+    # the signals are drawn with no more points than the figure can display,
+    # and their samples appear (as rasterized markers) once the user has
+    # zoomed in enough. The shared axes do not notify each other when their
+    # x-limits change, so each signal follows both of them.
+    n_out = int(fig.get_figwidth() * fig.dpi * 2)
+
+    # for each axes: its timescale, its data, its "+" symbol and the
+    # x value of the last click in it
+    plots = {}
+    for ax, other_ax, timescale, data, colors in [
+        (ax1, ax2, timescale1, signal1, colors1),
+        (ax2, ax1, timescale2, signal2, colors2),
+    ]:
+        _plot_envelope(
+            ax,
+            timescale,
+            data,
+            n_out,
+            linked_axes=[other_ax],
+            marker_kwargs=dict(
+                marker="o",
+                linestyle="",
+                markersize=3,
+                c=colors[1],
+                rasterized=True,
+                zorder=2,
+            ),
+            c=colors[0],
+            zorder=1,
+        )
+        (plus_symbol,) = ax.plot([], [], "k+", markersize=10)
+        plots[ax] = {
+            "timescale": timescale,
+            "data": data,
+            "plus_symbol": plus_symbol,
+            "selected": None,
+        }
+
+    # crosshairs following the mouse, only the cursor lines are redrawn
+    # (blitted) on each move, not the plotted signals
+    cursors = [Cursor(ax, useblit=True, color="k", linewidth=1) for ax in plots]
+
+    def onclick(event):
+        if event.inaxes in plots and event.xdata is not None:
+            plot = plots[event.inaxes]
+
+            # Update the position of the black "+" symbol of the clicked plot
+            closest_index_x = np.argmin(np.abs(plot["timescale"] - event.xdata))
+            plot["selected"] = plot["timescale"][closest_index_x]
+            plot["plus_symbol"].set_data(
+                [plot["selected"]], [plot["data"][closest_index_x]]
+            )
+            fig.canvas.draw_idle()
+
+    fig.canvas.mpl_connect("button_press_event", onclick)
+
+    fig.tight_layout()
+
+    plt.show(block=False)
+
+    while True:
+        input_y_or_n = _get_input_y_n("Artifacts found?")
+        if input_y_or_n == "y":
+            if all(plot["selected"] is not None for plot in plots.values()):
+                break
+            print("Please select a sample in both plots.")
+
+    return plots[ax1]["selected"], plots[ax2]["selected"]
@@ -1,15 +1,13 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.pyplot import figure
 import mne
 from os.path import join
-import json
 import matplotlib
 
 matplotlib.use("Qt5Agg")
 
-from functions.utils import _detrend_data
+from functions.utils import _detrend_data_for_plot, _plot_envelope, _load_params
 
 
 ## set font sizes and other parameters for the figures
@@ -41,7 +39,8 @@ def plot_channel(
     saving_path:str, 
     vertical_line,
     art_time,
-    scatter
+    scatter,
+    ax=None
 ):
     """
     Plots the selected channel for quick visualization (and saving).
@@ -58,23 +57,32 @@ def plot_channel(
         - art_time: float, the time of the vertical line
         - scatter: Boolean, if the user wants to see the
         samples instead of a continuous line
+        - ax: matplotlib Axes, default = None, a new figure is created.
+        If given, the axes are cleared and reused (e.g. to plot many sessions
+        in the same figure without creating a new one each time)
 
     Returns:
         - the plotted signal
     """
 
-    fig = figure(figsize=(12, 6), dpi=80)
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(12, 6), dpi=80)
+    else:
+        ax.clear()
+        fig = ax.figure
     if scatter:
-        plt.scatter(timescale, data, color=color)
+        ax.scatter(timescale, data, color=color)
     else:
-        plt.plot(timescale, data, linewidth=1, color=color)
-    plt.xlabel("Time (s)")
-    plt.ylabel(ylabel)
-    plt.title(str(session_ID))
+        # no need to draw more points than the figure can display
+        n_out = int(fig.get_figwidth() * fig.dpi * 2)
+        _plot_envelope(ax, timescale, data, n_out, linewidth=1, color=color)
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(str(session_ID))
     if vertical_line:
-        plt.axvline(x=art_time, color="black", linestyle="dashed", alpha=0.3)
+        ax.axvline(x=art_time, color="black", linestyle="dashed", alpha=0.3)
 
-    plt.savefig(
+    fig.savefig(
             (join(saving_path, title)),
             bbox_inches="tight",
         )    
@@ -109,19 +117,40 @@ def plot_LFP_stim(
         - the plotted signal with the stim
     """
 
-    LFP_L_channel = LFP_rec.get_data()[0]
-    LFP_R_channel = LFP_rec.get_data()[1]
-    stim_L_channel = LFP_rec.get_data()[4]
-    stim_R_channel = LFP_rec.get_data()[5]
+    # get_data returns a copy of the recording, only get the 4 channels once
+    (
+        LFP_L_channel,
+        LFP_R_channel,
+        stim_L_channel,
+        stim_R_channel,
+    ) = LFP_rec.get_data(picks=[0, 1, 4, 5])
     figure(figsize=(12, 6), dpi=80)
     fig, (ax1, ax2, ax3, ax4) = plt.subplots(4, 1)
+    # no need to draw more points than the figure can display
+    n_out = int(fig.get_figwidth() * fig.dpi * 2)
     ax1.set_title(str(session_ID))
-    ax1.plot(timescale, LFP_L_channel, linewidth=1, color="darkorange")
-    ax2.plot(
-        timescale, stim_L_channel, linewidth=1, color="darkorange", Linestyle="dashed"
+    _plot_envelope(
+        ax1, timescale, LFP_L_channel, n_out, linewidth=1, color="darkorange"
+    )
+    _plot_envelope(
+        ax2,
+        timescale,
+        stim_L_channel,
+        n_out,
+        linewidth=1,
+        color="darkorange",
+        linestyle="dashed",
+    )
+    _plot_envelope(ax3, timescale, LFP_R_channel, n_out, linewidth=1, color="purple")
+    _plot_envelope(
+        ax4,
+        timescale,
+        stim_R_channel,
+        n_out,
+        linewidth=1,
+        color="purple",
+        linestyle="dashed",
     )
-    ax3.plot(timescale, LFP_R_channel, linewidth=1, color="purple")
-    ax4.plot(timescale, stim_R_channel, linewidth=1, color="purple", linestyle="dashed")
     ax1.axes.xaxis.set_ticklabels([])
     ax2.axes.xaxis.set_ticklabels([])
     ax3.axes.xaxis.set_ticklabels([])
@@ -129,10 +158,10 @@ def plot_LFP_stim(
     ax2.set_ylabel("stim \n left (mA)")
     ax3.set_ylabel("LFP \n right (µV)")
     ax4.set_ylabel("stim \n right (mA)")
-    ax1.set_ylim(min(LFP_L_channel) - 50, max(LFP_L_channel) + 50)
-    ax2.set_ylim(0, max(stim_L_channel) + 0.5)
-    ax3.set_ylim(min(LFP_R_channel) - 50, max(LFP_R_channel) + 50)
-    ax4.set_ylim(0, max(stim_R_channel) + 0.5)
+    ax1.set_ylim(LFP_L_channel.min() - 50, LFP_L_channel.max() + 50)
+    ax2.set_ylim(0, stim_L_channel.max() + 0.5)
+    ax3.set_ylim(LFP_R_channel.min() - 50, LFP_R_channel.max() + 50)
+    ax4.set_ylim(0, stim_R_channel.max() + 0.5)
     plt.xlabel("Time (s)")
     fig.tight_layout()
 
@@ -147,8 +176,8 @@ def plot_LFP_stim(
 
 def plot_LFP_external(
     session_ID: str,
-    LFP_synchronized,
-    external_synchronized,
+    LFP_synchronized: np.ndarray,
+    external_synchronized: np.ndarray,
     sf_LFP: int,
     sf_external: int,
     ch_idx_lfp: int,
@@ -162,8 +191,8 @@ def plot_LFP_external(
 
     Inputs:
         - session_ID: str, the subject ID
-        - LFP_synchronized: pd.DataFrame, the synchronized LFP signal
-        - external_synchronized: pd.DataFrame, the synchronized external signal
+        - LFP_synchronized: np.ndarray, the synchronized LFP signal
+        - external_synchronized: np.ndarray, the synchronized external signal
         - sf_LFP: int, the sampling frequency of the LFP signal
         - sf_external: int, the sampling frequency of the external signal
         - ch_idx_lfp: int, the index of the LFP channel
@@ -182,14 +211,14 @@ def plot_LFP_external(
     BIP_channel_offset = external_synchronized[:, ch_index_external]
 
     # pre-processing of external bipolar channel :
-    filtered_external_offset = _detrend_data(BIP_channel_offset)
+    filtered_external_offset = _detrend_data_for_plot(BIP_channel_offset)
 
     # Generate new timescales:
-    LFP_timescale_offset_s = np.arange(
-        0, (len(LFP_channel_offset) / sf_LFP), 1 / sf_LFP
+    LFP_timescale_offset_s = (
+        np.arange(len(LFP_channel_offset), dtype=np.float64) / sf_LFP
     )
-    external_timescale_offset_s = np.arange(
-        0, (len(BIP_channel_offset) / sf_external), 1 / sf_external
+    external_timescale_offset_s = (
+        np.arange(len(BIP_channel_offset), dtype=np.float64) / sf_external
     )
 
     # PLOT 8: Both signals aligned with all their artifacts detected:
@@ -197,20 +226,30 @@ def plot_LFP_external(
     fig.suptitle(str(session_ID))
     fig.set_figheight(6)
     fig.set_figwidth(12)
+    # no need to draw more points than the figure can display
+    n_out = int(fig.get_figwidth() * fig.dpi * 2)
     ax1.set_xlabel("Time (s)")
     ax1.set_ylabel("Intracerebral LFP channel (µV)")
     ax1.set_xlim(0, len(LFP_channel_offset) / sf_LFP)
-    ax1.plot(
+    ax2 = ax1.twinx()
+    # the twin axes do not notify each other when their x-limits change, so
+    # each line follows both of them
+    _plot_envelope(
+        ax1,
         LFP_timescale_offset_s,
         LFP_channel_offset,
+        n_out,
+        linked_axes=[ax2],
         color="darkorange",
         zorder=1,
         linewidth=0.3,
     )
-    ax2 = ax1.twinx()
-    ax2.plot(
+    _plot_envelope(
+        ax2,
         external_timescale_offset_s,
         filtered_external_offset,
+        n_out,
+        linked_axes=[ax1],
         color="darkcyan",
         zorder=1,
         linewidth=0.1,
@@ -227,9 +266,9 @@ def plot_LFP_external(
 
 def ecg(
     session_ID: str,
-    LFP_synchronized: pd.DataFrame,
+    LFP_synchronized: np.ndarray,
     sf_LFP: int,
-    external_synchronized: pd.DataFrame,
+    external_synchronized: np.ndarray,
     sf_external: int,
     saving_path: str,
     xmin: float,
@@ -242,9 +281,9 @@ def ecg(
 
     Inputs:
         - session_ID: str, the subject ID
-        - LFP_synchronized: pd.DataFrame, the synchronized LFP signal
+        - LFP_synchronized: np.ndarray, the synchronized LFP signal
         - sf_LFP: int, the sampling frequency of the LFP signal
-        - external_synchronized: pd.DataFrame, the synchronized external signal
+        - external_synchronized: np.ndarray, the synchronized external signal
         - sf_external: int, the sampling frequency of the external signal
         - saving_path: str, the folder where the plot has to be saved
         - xmin: float, the timestamp to start the plot
@@ -255,20 +294,25 @@ def ecg(
     """
 
     # import settings
-    json_filename = join(saving_path, "parameters_" + str(session_ID) + ".json")
-    with open(json_filename, "r") as f:
-        loaded_dict = json.load(f)
+    loaded_dict = _load_params(session_ID, saving_path)
 
     # Reselect artifact channels in the aligned (= cropped) files
     LFP_channel_offset = LFP_synchronized[:, loaded_dict["CH_IDX_LFP"]]
     BIP_channel_offset = external_synchronized[:, loaded_dict["CH_IDX_EXTERNAL"]]
 
-    # Generate new timescales:
-    LFP_timescale_offset_s = np.arange(
-        0, (len(LFP_channel_offset) / sf_LFP), 1 / sf_LFP
+    # Only the samples between xmin and xmax are shown (plus one sample on
+    # each side so that the lines reach the borders of the plot):
+    lfp_start = max(0, int(np.floor(xmin * sf_LFP)))
+    lfp_stop = min(len(LFP_channel_offset), int(np.ceil(xmax * sf_LFP)) + 1)
+    external_start = max(0, int(np.floor(xmin * sf_external)))
+    external_stop = min(len(BIP_channel_offset), int(np.ceil(xmax * sf_external)) + 1)
+
+    # Generate new timescales (for the displayed window only):
+    LFP_timescale_offset_s = (
+        np.arange(lfp_start, lfp_stop, dtype=np.float64) / sf_LFP
     )
-    external_timescale_offset_s = np.arange(
-        0, (len(BIP_channel_offset) / sf_external), 1 / sf_external
+    external_timescale_offset_s = (
+        np.arange(external_start, external_stop, dtype=np.float64) / sf_external
     )
 
     # make plot on beginning of recordings:
@@ -285,14 +329,14 @@ def ecg(
     ax1.set_ylim(-50, 50)
     ax1.plot(
         LFP_timescale_offset_s,
-        LFP_channel_offset,
+        LFP_channel_offset[lfp_start:lfp_stop],
         color="darkorange",
         zorder=1,
         linewidth=1,
     )
     ax2.plot(
         external_timescale_offset_s,
-        BIP_channel_offset,
+        BIP_channel_offset[external_start:external_stop],
         color="darkcyan",
         zorder=1,
         linewidth=1,
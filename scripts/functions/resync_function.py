@@ -1,6 +1,7 @@
 # import librairies
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from os.path import join
 import pickle
 from scipy.io import savemat
@@ -41,16 +42,14 @@ def detect_artifacts_in_external_recording(
     """
 
     # Generate timescale:
-    external_timescale_s = np.arange(
-        start=0, stop=(len(BIP_channel) / sf_external), step=(1 / sf_external)
-    )
+    external_timescale_s = np.arange(len(BIP_channel), dtype=np.float64) / sf_external
 
     # apply a highpass filter at 1Hz to the external bipolar channel (detrending)
     filtered_external = _detrend_data(BIP_channel)
 
     # PLOT 1 :
     # plot the signal of the external channel used for artifact detection:
-    plot_channel(
+    fig = plot_channel(
         session_ID=session_ID,
         timescale=external_timescale_s,
         data=filtered_external,
@@ -62,7 +61,7 @@ def detect_artifacts_in_external_recording(
         art_time=None,
         scatter=False
     )
-    plt.close()
+    plt.close(fig)
 
     ### DETECT ARTIFACTS ###
 
@@ -88,8 +87,10 @@ def detect_artifacts_in_external_recording(
 
     # PLOT 3 :
     # plot the first artifact detected in external channel (verification of sample choice):
-    idx_start = np.where(external_timescale_s == art_start_BIP - (60 / sf_external))[0][0]
-    idx_end = np.where(external_timescale_s == art_start_BIP + (60 / sf_external))[0][0]    
+    # (sample index computed from the time, not by float equality on the timescale)
+    art_idx_BIP = round(art_start_BIP * sf_external)
+    idx_start = max(0, art_idx_BIP - 60)
+    idx_end = art_idx_BIP + 60
     plot_channel(
         session_ID=session_ID,
         timescale=external_timescale_s[idx_start:idx_end],
@@ -129,13 +130,11 @@ def detect_artifacts_in_intracranial_recording(
     """
 
     # Generate timescale:
-    LFP_timescale_s = np.arange(
-        start=0, stop=(len(lfp_sig) / sf_LFP), step=(1 / sf_LFP)
-    )
+    LFP_timescale_s = np.arange(len(lfp_sig), dtype=np.float64) / sf_LFP
 
     # PLOT 4 :
     # raw signal of the intracranial channel used for artifact detection:
-    plot_channel(
+    fig = plot_channel(
         session_ID=session_ID,
         timescale=LFP_timescale_s,
         data=lfp_sig,
@@ -147,7 +146,7 @@ def detect_artifacts_in_intracranial_recording(
         art_time=None,
         scatter=False
     )
-    plt.close()
+    plt.close(fig)
 
     ### DETECT ARTIFACTS ###
     if method in ["1", "2", "thresh"]:
@@ -173,8 +172,10 @@ def detect_artifacts_in_intracranial_recording(
 
         # PLOT 6 :
         # plot the first artifact detected in intracranial channel (verification of sample choice):
-        idx_start = round(np.where(LFP_timescale_s == (art_start_LFP))[0][0] - (0.1*sf_LFP))
-        idx_end = round(np.where(LFP_timescale_s == (art_start_LFP))[0][0] + (0.3*sf_LFP))
+        # (sample index computed from the time, not by float equality on the timescale)
+        art_idx_LFP = round(art_start_LFP * sf_LFP)
+        idx_start = max(0, round(art_idx_LFP - (0.1*sf_LFP)))
+        idx_end = round(art_idx_LFP + (0.3*sf_LFP))
         plot_channel(
             session_ID=session_ID,
             timescale=LFP_timescale_s[idx_start:idx_end],
@@ -200,8 +201,10 @@ def detect_artifacts_in_intracranial_recording(
         )
 
         # PLOT 7 : plot the artifact adjusted by user in the intracranial channel:
-        idx_start = round(np.where(LFP_timescale_s == (art_start_LFP))[0][0] - (0.1*sf_LFP))
-        idx_end = round(np.where(LFP_timescale_s == (art_start_LFP))[0][0] + (0.3*sf_LFP))
+        # (sample index computed from the time, not by float equality on the timescale)
+        art_idx_LFP = round(art_start_LFP * sf_LFP)
+        idx_start = max(0, round(art_idx_LFP - (0.1*sf_LFP)))
+        idx_end = round(art_idx_LFP + (0.3*sf_LFP))
         plot_channel(
             session_ID=session_ID,
             timescale=LFP_timescale_s[idx_start:idx_end],
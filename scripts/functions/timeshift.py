@@ -1,10 +1,11 @@
-import json
 import numpy as np
-import matplotlib.pyplot as plt
 from os.path import join
 
-from functions.interactive import select_sample
-from functions.utils import _update_and_save_multiple_params, _detrend_data
+from functions.utils import (
+    _update_and_save_multiple_params,
+    _detrend_data,
+    _load_params,
+)
 
 
 def check_timeshift(
@@ -21,10 +22,11 @@ def check_timeshift(
     that the internal clocks are not completely identical. This function allows
     to check this and to warn in case of a large timeshift.
     To do so, the function plots the intracranial recording and the external one.
-    On each plot, the user is asked to select the sample corresponding to the
-    last artifact in the recording. The function then computes the time difference
-    between the two times. If the difference is large, it may indicate a problem
-    in the recording, such as a packet loss in the intracranial recording.
+    On each plot (both shown in the same window), the user is asked to select
+    the sample corresponding to the last artifact in the recording. The function
+    then computes the time difference between the two times. If the difference
+    is large, it may indicate a problem in the recording, such as a packet loss
+    in the intracranial recording.
 
     Inputs:
         - session_ID: str, the subject ID
@@ -39,35 +41,49 @@ def check_timeshift(
 
     """
 
+    # pyplot (and its GUI backend) is only loaded when the check is run,
+    # not when this module is imported
+    import matplotlib.pyplot as plt
+    from functions.interactive import select_two_samples
+
     # import settings
-    json_filename = saving_path + "\\parameters_" + str(session_ID) + ".json"
-    with open(json_filename, "r") as f:
-        loaded_dict = json.load(f)
+    loaded_dict = _load_params(session_ID, saving_path)
 
-    LFP_channel_offset = LFP_synchronized[:, loaded_dict["CH_IDX_LFP"]]
-    BIP_channel_offset = external_synchronized[:, loaded_dict["CH_IDX_EXTERNAL"]]
+    # a column of a 2D array is a strided view, copy the channels to
+    # contiguous arrays once before filtering and plotting them
+    # (single precision is enough to display the signals, the timescales
+    # stay in double precision to keep sample accuracy on long recordings)
+    LFP_channel_offset = np.ascontiguousarray(
+        LFP_synchronized[:, loaded_dict["CH_IDX_LFP"]], dtype=np.float32
+    )
+    BIP_channel_offset = np.ascontiguousarray(
+        external_synchronized[:, loaded_dict["CH_IDX_EXTERNAL"]], dtype=np.float64
+    )
 
     # Generate new timescales:
-    LFP_timescale_offset_s = np.arange(
-        start=0, stop=len(LFP_channel_offset) / sf_LFP, step=1 / sf_LFP
+    LFP_timescale_offset_s = (
+        np.arange(len(LFP_channel_offset), dtype=np.float64) / sf_LFP
     )
-    external_timescale_offset_s = np.arange(
-        start=0, stop=len(external_synchronized) / sf_external, step=1 / sf_external
+    external_timescale_offset_s = (
+        np.arange(len(BIP_channel_offset), dtype=np.float64) / sf_external
     )
 
     # detrend external recording with high-pass filter before processing:
-    filtered_external_offset = _detrend_data(BIP_channel_offset)
+    # (the raw channel can carry a large offset, so it is filtered in double
+    # precision and only the filtered signal is kept in single precision)
+    filtered_external_offset = _detrend_data(BIP_channel_offset).astype(np.float32)
 
-    print("Select the first sample of the last artifact in the intracranial recording")
-    last_artifact_lfp_x = select_sample(
-        signal=LFP_channel_offset, sf=sf_LFP, color1="peachpuff", color2="darkorange"
+    print(
+        "Select the first sample of the last artifact in the intracranial (top)"
+        " and external (bottom) recordings"
     )
-    print("Select the first sample of the last artifact in the external recording")
-    last_artifact_external_x = select_sample(
-        signal=filtered_external_offset,
-        sf=sf_external,
-        color1="paleturquoise",
-        color2="darkcyan",
+    last_artifact_lfp_x, last_artifact_external_x = select_two_samples(
+        signal1=LFP_channel_offset,
+        sf1=sf_LFP,
+        signal2=filtered_external_offset,
+        sf2=sf_external,
+        colors1=("peachpuff", "darkorange"),
+        colors2=("paleturquoise", "darkcyan"),
     )
 
     timeshift_ms = (last_artifact_external_x - last_artifact_lfp_x) * 1000
@@ -89,31 +105,50 @@ def check_timeshift(
     ax2.set_xlabel("Time (s)")
     ax1.set_ylabel("Intracranial LFP channel (µV)")
     ax2.set_ylabel("External bipolar channel (mV)")
-    ax1.set_xlim(last_artifact_external_x - 0.1, last_artifact_external_x + 0.1)
-    ax2.set_xlim(last_artifact_external_x - 0.1, last_artifact_external_x + 0.1)
-    ax1.plot(LFP_timescale_offset_s, LFP_channel_offset, color="peachpuff", zorder=1)
-    ax1.scatter(
-        LFP_timescale_offset_s, LFP_channel_offset, color="darkorange", s=4, zorder=2
+    xmin = last_artifact_external_x - 0.1
+    xmax = last_artifact_external_x + 0.1
+    ax1.set_xlim(xmin, xmax)
+    ax2.set_xlim(xmin, xmax)
+
+    # Only the samples between xmin and xmax are plotted (plus one sample on
+    # each side so that the lines reach the borders of the plot):
+    lfp_lo, lfp_hi = np.searchsorted(LFP_timescale_offset_s, [xmin, xmax])
+    lfp_window = slice(max(0, lfp_lo - 1), lfp_hi + 1)
+    external_lo, external_hi = np.searchsorted(
+        external_timescale_offset_s, [xmin, xmax]
     )
-    ax1.axvline(
-        x=last_artifact_lfp_x,
-        ymin=min(LFP_channel_offset),
-        ymax=max(LFP_channel_offset),
-        color="black",
-        linestyle="dashed",
-        alpha=0.3,
+    external_window = slice(max(0, external_lo - 1), external_hi + 1)
+
+    ax1.plot(
+        LFP_timescale_offset_s[lfp_window],
+        LFP_channel_offset[lfp_window],
+        color="peachpuff",
+        zorder=1,
+    )
+    # samples are drawn as rasterized markers (much faster than a scatter)
+    ax1.plot(
+        LFP_timescale_offset_s[lfp_window],
+        LFP_channel_offset[lfp_window],
+        "o",
+        markersize=2,
+        color="darkorange",
+        rasterized=True,
+        zorder=2,
     )
+    ax1.axvline(x=last_artifact_lfp_x, color="black", linestyle="dashed", alpha=0.3)
     ax2.plot(
-        external_timescale_offset_s,
-        filtered_external_offset,
+        external_timescale_offset_s[external_window],
+        filtered_external_offset[external_window],
         color="paleturquoise",
         zorder=1,
     )
-    ax2.scatter(
-        external_timescale_offset_s,
-        filtered_external_offset,
+    ax2.plot(
+        external_timescale_offset_s[external_window],
+        filtered_external_offset[external_window],
+        "o",
+        markersize=2,
         color="darkcyan",
-        s=4,
+        rasterized=True,
         zorder=2,
     )
     ax2.axvline(
@@ -127,7 +162,6 @@ def check_timeshift(
         transform=ax1.transAxes,
     )
 
-    plt.gcf()
     plt.show(block=True)
     fig.savefig(
         join(
@@ -135,5 +169,6 @@ def check_timeshift(
             "FigA-Timeshift - Intracranial and external recordings aligned - last artifact.png",
         ),
         bbox_inches="tight",
-        dpi=1200,
+        dpi=200,
     )
+    plt.close(fig)
@@ -4,12 +4,21 @@ utilisation function
 
 import os
 import json
+from functools import lru_cache
 from tkinter.filedialog import askdirectory
 import scipy
 import operator
 import pandas as pd
 import numpy as np
 
+# numba is optional, scipy's sosfiltfilt is used without it
+try:
+    from functions._numba_kernels import _sosfiltfilt
+
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
 
 parameters = {}
 def _update_and_save_multiple_params(
@@ -30,8 +39,40 @@ def _update_and_save_multiple_params(
     
     parameter_filename = "parameters_" + str(session_ID) + ".json"
     json_file_path = os.path.join(saving_path, parameter_filename)
-    with open(json_file_path, "w") as json_file:
+    # write to a temporary file first and then replace the parameters file,
+    # so that it is never left half-written (e.g. if the script is interrupted)
+    tmp_file_path = json_file_path + ".tmp"
+    with open(tmp_file_path, "w") as json_file:
         json.dump(parameters, json_file, indent=4)
+    os.replace(tmp_file_path, json_file_path)
+
+
+
+def _load_params(session_ID: str, saving_path: str):
+    """
+    This function loads the parameters json file of a session. The content is
+    cached, and only read again from disk when the file has been modified since.
+
+    Inputs:
+        - session_ID: str, the session identifier
+        - saving_path: str, the path where to find the json file
+
+    Returns:
+        - loaded_dict: dict, the parameters (shared between calls, do not modify)
+    """
+
+    parameter_filename = "parameters_" + str(session_ID) + ".json"
+    json_path = os.path.join(saving_path, parameter_filename)
+    file_stat = os.stat(json_path)
+    return _load_params_cached(json_path, file_stat.st_mtime_ns, file_stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _load_params_cached(json_path: str, mtime_ns: int, size: int):
+    # mtime_ns and size are only part of the cache key
+    with open(json_path, "r") as json_file:
+        loaded_dict = json.load(json_file)
+    return loaded_dict
 
 
 
@@ -46,11 +87,7 @@ def _update_and_save_params(key, value, session_ID: str, saving_path: str):
         - saving_path: str, the path where to save/find the json file
     """
 
-    parameters[key] = value
-    parameter_filename = "parameters_" + str(session_ID) + ".json"
-    json_file_path = os.path.join(saving_path, parameter_filename)
-    with open(json_file_path, "w") as json_file:
-        json.dump(parameters, json_file, indent=4)
+    _update_and_save_multiple_params({key: value}, session_ID, saving_path)
 
 
 
@@ -183,12 +220,170 @@ def _detrend_data(data: np.ndarray):
         - detrended_data: np.ndarray, the detrended data
     """
 
-    b, a = scipy.signal.butter(1, 0.05, "highpass")
-    detrended_data = scipy.signal.filtfilt(b, a, data)
+    sos = _butter_hp(1, 0.05)
+    if HAVE_NUMBA and len(data) > 10**6:
+        # same filtering (odd padding and initial conditions) in a single
+        # compiled loop, faster on long recordings
+        # (default padding length of sosfiltfilt)
+        padlen = 3 * (
+            2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+        )
+        detrended_data = _sosfiltfilt(
+            sos,
+            np.ascontiguousarray(data, dtype=np.float64),
+            scipy.signal.sosfilt_zi(sos),
+            padlen,
+        )
+    else:
+        detrended_data = scipy.signal.sosfiltfilt(sos, data)
 
     return detrended_data
 
 
+@lru_cache(maxsize=8)
+def _butter_hp(order: int, wn: float):
+    """
+    This function returns the second-order sections of a Butterworth
+    high-pass filter. The coefficients are computed once per (order, wn)
+    and then reused.
+
+    Inputs:
+        - order: int, the order of the filter
+        - wn: float, the normalized cutoff frequency
+
+    Returns:
+        - sos: np.ndarray, the second-order sections of the filter (shared
+        between calls, do not modify)
+    """
+
+    sos = scipy.signal.butter(order, wn, "highpass", output="sos")
+
+    return sos
+
+
+def _detrend_data_for_plot(data: np.ndarray):
+    """
+    This function is a lighter version of _detrend_data, used only to display
+    signals. The same high-pass filter is applied in a single forward pass
+    instead of forward and backward (not zero-phase), which halves the
+    computation on long recordings. Sharp artifact onsets stay on the same
+    sample, so it is enough to visually check the synchronization.
+
+    Inputs:
+        - data: np.ndarray, the data to detrend
+
+    Returns:
+        - detrended_data: np.ndarray, the detrended data
+    """
+
+    sos = _butter_hp(1, 0.05)
+    # start the filter in steady state to avoid a transient from the offset
+    zi = scipy.signal.sosfilt_zi(sos) * data[0]
+    detrended_data, _ = scipy.signal.sosfilt(sos, data, zi=zi)
+
+    return detrended_data
+
+
+def _envelope(timescale: np.ndarray, data: np.ndarray, n_out: int):
+    """
+    This function reduces a signal to its min/max envelope before plotting,
+    so that a long recording is not drawn with more points than the figure
+    can display. The signal is split in n_out consecutive blocks and each
+    block is replaced by its minimum and maximum samples, kept at their own
+    time and in time order, so artifacts stay visible at the right place.
+
+    Inputs:
+        - timescale: np.ndarray, the timescale of the signal
+        - data: np.ndarray, the signal
+        - n_out: int, the number of blocks (the returned arrays have
+        2 * n_out points at most)
+
+    Returns:
+        - env_timescale: np.ndarray, the timescale of the envelope
+        - env_data: np.ndarray, the envelope (min and max of each block)
+    """
+
+    if len(data) <= 2 * n_out:
+        return timescale, data
+
+    # blocks of the same size, the last one can be shorter
+    block_size = -(-len(data) // n_out)
+    n_full = len(data) // block_size
+    full_blocks = data[: n_full * block_size].reshape(n_full, block_size)
+    offsets = np.arange(n_full) * block_size
+    idx_min = offsets + full_blocks.argmin(axis=1)
+    idx_max = offsets + full_blocks.argmax(axis=1)
+    if n_full * block_size < len(data):
+        last_block = data[n_full * block_size :]
+        idx_min = np.append(idx_min, n_full * block_size + last_block.argmin())
+        idx_max = np.append(idx_max, n_full * block_size + last_block.argmax())
+
+    idx = np.column_stack(
+        [np.minimum(idx_min, idx_max), np.maximum(idx_min, idx_max)]
+    ).ravel()
+
+    return np.asarray(timescale)[idx], data[idx]
+
+
+def _plot_envelope(
+    ax,
+    timescale: np.ndarray,
+    data: np.ndarray,
+    n_out: int,
+    linked_axes=(),
+    marker_kwargs=None,
+    **kwargs
+):
+    """
+    This function plots a signal on the given axes as its min/max envelope
+    (see _envelope), and recomputes the envelope on the visible time range
+    each time the x-limits change. When the user zooms in, the samples are
+    therefore drawn at full resolution as soon as they fit in the figure.
+    The samples can also be drawn as markers, only once they fit in the
+    figure (thousands of markers are slow to draw and unreadable anyway).
+
+    Inputs:
+        - ax: matplotlib Axes, the axes to plot on
+        - timescale: np.ndarray, the timescale of the signal (increasing)
+        - data: np.ndarray, the signal
+        - n_out: int, the number of blocks of the envelope
+        - linked_axes: default = (), axes sharing their x-axis with ax (e.g.
+        from twinx or sharex). Their x-limits changes also update the
+        envelope, as matplotlib does not always notify ax (e.g. zoom on
+        the other axes)
+        - marker_kwargs: default = None, if given, the samples are also drawn
+        with ax.plot(..., **marker_kwargs) (marker, color, ...) when at most
+        n_out of them are visible
+        - kwargs: passed to ax.plot (color, linewidth, ...)
+
+    Returns:
+        - line: matplotlib Line2D, the plotted line
+    """
+
+    (line,) = ax.plot(*_envelope(timescale, data, n_out), **kwargs)
+    if marker_kwargs is not None:
+        (markers,) = ax.plot([], [], **marker_kwargs)
+        if len(data) <= n_out:
+            markers.set_data(timescale, data)
+
+    def update_envelope(changed_ax):
+        xmin, xmax = changed_ax.get_xlim()
+        # one extra sample on each side so that the line reaches the borders
+        start, stop = np.searchsorted(timescale, [xmin, xmax])
+        start, stop = max(0, start - 1), stop + 1
+        line.set_data(*_envelope(timescale[start:stop], data[start:stop], n_out))
+        if marker_kwargs is not None:
+            if stop - start <= n_out:
+                markers.set_data(timescale[start:stop], data[start:stop])
+            else:
+                markers.set_data([], [])
+
+    for axes in [ax, *linked_axes]:
+        axes.callbacks.connect("xlim_changed", update_envelope)
+
+    return line
+
+
 def _define_folders():
     """
     This function is used only in the notebook, if the user hasn't already define
@@ -1,4 +1,5 @@
 import os
+import matplotlib.pyplot as plt
 import pandas as pd
 from os.path import join
 
@@ -177,6 +178,8 @@ def main_batch(
         artifact_correct = _get_input_y_n(
             "Is the external DBS artifact properly selected ? "
         )
+        # the verification figures are saved, close them to free memory
+        plt.close("all")
         if artifact_correct in ("y", "Y"):
             _update_and_save_params(
                 key="ART_TIME_BIP",
@@ -227,6 +230,7 @@ def main_batch(
             artifact_correct = _get_input_y_n(
                 "Is the intracranial DBS artifact properly selected ? "
             )
+            plt.close("all")
             if artifact_correct in ("y","Y"):
                 dictionary = {"ART_TIME_LFP": art_start_LFP, "METHOD": method}
                 _update_and_save_multiple_params(dictionary,session_ID,saving_path)
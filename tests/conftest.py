@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the functions are imported as in the scripts (from functions.x import ...),
+# with the scripts folder as working directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
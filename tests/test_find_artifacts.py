@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from functions import find_artifacts
+from functions.find_artifacts import find_external_sync_artifact, find_LFP_sync_artifact
+
+
+def _external_loop_reference(data, sf_external, start_index=0):
+    """Original (loop) implementation of find_external_sync_artifact."""
+    polarity_window = data[:-1000]
+    if abs(polarity_window.max()) > abs(polarity_window.min()):
+        data = -data
+    thresh_BIP = -1.5 * (np.ptp(data[: int(sf_external * 2)]))
+    for q in range(start_index, len(data) - 2):
+        if (
+            (data[q] <= thresh_BIP)
+            and (data[q] < data[q + 1])
+            and (data[q] < data[q - 1])
+        ):
+            return q / sf_external
+    return None
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def detection_path(request, monkeypatch):
+    """Runs a test with the numba kernels and with the NumPy fallback."""
+    if request.param == "numba":
+        if not find_artifacts.HAVE_NUMBA:
+            pytest.skip("numba is not installed")
+    else:
+        monkeypatch.setattr(find_artifacts, "HAVE_NUMBA", False)
+    return request.param
+
+
+def _external_signal(n_samples=10000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(n_samples) * 0.1
+
+
+def test_external_first_artifact(detection_path):
+    data = _external_signal()
+    data[[3000, 3010, 3020]] = -50
+    assert find_external_sync_artifact(data, 1000) == 3.0
+
+
+def test_external_artifact_on_start_index(detection_path):
+    data = _external_signal()
+    data[[2000, 3000]] = -50
+    assert find_external_sync_artifact(data, 1000, start_index=2000) == 2.0
+    assert find_external_sync_artifact(data, 1000, start_index=2001) == 3.0
+
+
+def test_external_flat_minimum_is_skipped(detection_path):
+    data = _external_signal()
+    data[3000:3002] = -50  # flat minimum (e.g. saturated amplifier)
+    data[4000] = -50
+    assert find_external_sync_artifact(data, 1000) == 4.0
+
+
+def test_external_inverted_artifact(detection_path):
+    data = _external_signal()
+    data[[3000, 3010]] = 50
+    assert find_external_sync_artifact(data, 1000) == 3.0
+
+
+def test_external_matches_loop(detection_path):
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        n_samples = int(rng.integers(3000, 20000))
+        data = _external_signal(n_samples, seed=int(rng.integers(1 << 31)))
+        for _ in range(int(rng.integers(1, 6))):
+            start = int(rng.integers(2000, n_samples - 3))
+            data[start : start + int(rng.integers(1, 4))] = -50
+        if rng.random() < 0.3:
+            data = np.round(data * 4) / 4  # quantized values
+        start_index = int(rng.integers(0, n_samples - 3)) if rng.random() < 0.5 else 0
+        if rng.random() < 0.2:
+            start_index = int(np.argmin(data))
+
+        expected = _external_loop_reference(data.copy(), 1000, start_index)
+        if expected is None:
+            with pytest.raises(AssertionError):
+                find_external_sync_artifact(data.copy(), 1000, start_index)
+        else:
+            assert find_external_sync_artifact(data.copy(), 1000, start_index) == expected
+
+
+def _lfp_signal(sign, sf_LFP=250, seed=0):
+    """
+    60 s of noise with 4 stimulation pulses of 1 s. Each pulse gives a sharp
+    deflection followed by a slow recovery when the stimulation is turned on,
+    and the opposite deflection when it is turned off. sign=1 gives negative
+    artifacts ('normal' signal), sign=-1 positive ones (inverted signal).
+    """
+    rng = np.random.default_rng(seed)
+    data = rng.standard_normal(sf_LFP * 60)
+    onsets = [10 * sf_LFP + 17, 20 * sf_LFP + 3, 30 * sf_LFP + 101, 40 * sf_LFP + 55]
+    decay = np.exp(-np.arange(sf_LFP) / 15)
+    for onset in onsets:
+        data[onset : onset + sf_LFP] -= sign * 100 * decay
+        data[onset + sf_LFP : onset + 2 * sf_LFP] += sign * 100 * decay
+    return data, onsets[0]
+
+
+@pytest.mark.parametrize("sign", [1, -1], ids=["normal", "inverted"])
+@pytest.mark.parametrize("use_method, offset", [("1", -1), ("2", -2), ("thresh", -1)])
+def test_LFP_first_artifact(detection_path, sign, use_method, offset):
+    data, onset = _lfp_signal(sign)
+    art_time = find_LFP_sync_artifact(data, 250, use_method)
+    assert art_time == (onset + offset) / 250
+
+
+@pytest.mark.parametrize("sign", [1, -1], ids=["normal", "inverted"])
+def test_LFP_inversion_detected(detection_path, sign, capsys):
+    data, _ = _lfp_signal(sign)
+    find_LFP_sync_artifact(data, 250, "2")
+    inverted = "intracranial signal is inverted" in capsys.readouterr().out
+    assert inverted == (sign == -1)
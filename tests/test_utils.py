@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+import scipy.signal
+
+from functions.utils import _butter_hp, _detrend_data, _envelope, _plot_envelope
+
+
+@pytest.mark.parametrize("n_samples", [2400, 2401, 100003, 600000])
+def test_envelope_keeps_block_extrema(n_samples):
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal(n_samples)
+    timescale = np.arange(n_samples) / 1000
+    n_out = 1200
+
+    env_timescale, env_data = _envelope(timescale, data, n_out)
+
+    # the points are real samples, in time order
+    idx = np.searchsorted(timescale, env_timescale)
+    assert np.array_equal(timescale[idx], env_timescale)
+    assert np.array_equal(data[idx], env_data)
+    assert np.all(np.diff(idx) >= 0)
+    assert len(env_data) <= 2 * n_out
+
+    # each block is represented by its minimum and maximum
+    block_size = -(-n_samples // n_out)
+    for start in range(0, n_samples, block_size):
+        block_idx = idx[(idx >= start) & (idx < start + block_size)]
+        block = data[start : start + block_size]
+        assert block.min() == data[block_idx].min()
+        assert block.max() == data[block_idx].max()
+
+
+def test_envelope_short_signal_unchanged():
+    data = np.arange(10.0)
+    timescale = np.arange(10) / 250
+    env_timescale, env_data = _envelope(timescale, data, 5)
+    assert env_timescale is timescale
+    assert env_data is data
+
+
+def test_plot_envelope_follows_linked_axes():
+    plt = pytest.importorskip("matplotlib.pyplot")
+    timescale = np.arange(100000) / 1000
+    data = np.random.default_rng(0).standard_normal(100000)
+    fig, ax1 = plt.subplots()
+    ax2 = ax1.twinx()
+    line = _plot_envelope(ax2, timescale, data, 500, linked_axes=[ax1])
+    assert len(line.get_xdata()) <= 1000
+
+    # zooming on ax1 (e.g. with the toolbar) refines the line drawn on ax2
+    ax1.set_xlim(10, 10.1)
+    start, stop = np.searchsorted(timescale, [10, 10.1])
+    np.testing.assert_array_equal(line.get_xdata(), timescale[start - 1 : stop + 1])
+    plt.close(fig)
+
+
+def test_plot_envelope_markers_only_when_zoomed_in():
+    plt = pytest.importorskip("matplotlib.pyplot")
+    timescale = np.arange(100000) / 1000
+    data = np.random.default_rng(0).standard_normal(100000)
+    fig, ax = plt.subplots()
+    _plot_envelope(ax, timescale, data, 500, marker_kwargs=dict(marker="o"))
+    markers = ax.lines[-1]
+    assert len(markers.get_xdata()) == 0
+
+    ax.set_xlim(10, 10.1)
+    start, stop = np.searchsorted(timescale, [10, 10.1])
+    np.testing.assert_array_equal(markers.get_xdata(), timescale[start - 1 : stop + 1])
+    np.testing.assert_array_equal(markers.get_ydata(), data[start - 1 : stop + 1])
+
+    ax.set_xlim(0, 100)
+    assert len(markers.get_xdata()) == 0
+    plt.close(fig)
+
+
+@pytest.mark.parametrize("n_samples", [1000, 2 * 10**6 + 1])
+def test_detrend_data_matches_sosfiltfilt(n_samples):
+    # above 10**6 samples, the compiled filter is used when numba is installed
+    rng = np.random.default_rng(0)
+    data = np.cumsum(rng.standard_normal(n_samples)) + 5e4
+    expected = scipy.signal.sosfiltfilt(_butter_hp(1, 0.05), data)
+    np.testing.assert_allclose(_detrend_data(data), expected, rtol=0, atol=1e-9)
+
+
+def test_numba_sosfiltfilt_matches_scipy():
+    pytest.importorskip("numba")
+    from functions._numba_kernels import _sosfiltfilt
+
+    rng = np.random.default_rng(1)
+    data = np.cumsum(rng.standard_normal(10000))
+    for sos in [_butter_hp(1, 0.05), scipy.signal.butter(4, 0.1, output="sos")]:
+        padlen = 3 * (
+            2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+        )
+        expected = scipy.signal.sosfiltfilt(sos, data)
+        result = _sosfiltfilt(sos, data, scipy.signal.sosfilt_zi(sos), padlen)
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9)